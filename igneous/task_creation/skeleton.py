@@ -224,7 +224,7 @@ def create_skeletonizing_tasks(
       bbox = Bbox( offset, shape + offset ) * vol.resolution
       center = bbox.center()
       diagonal = Vec(*((bbox.maxpt - center)))
-      pts = [ centroids[i,:] for i in kdtree.query_ball_point(center, diagonal.length()) ]
+      pts = centroids[ kdtree.query_ball_point(center, diagonal.length()) ]
       pts = [ tuple(Vec(*pt, dtype=int)) for pt in pts if bbox.contains(pt) ]
 
       synapses = defaultdict(list)
@@ -53,10 +53,10 @@ def execute(queue, region_name, endpoint_url, seconds, tally, loop):
   print("Pulling from {}".format(tq.qualified_path))
   seconds = int(seconds)
 
+  threshold = loop if loop >= 0 else float('inf')
+
   def stop_after_elapsed_time(elapsed_time):
-    if loop < 0:
-      return False
-    return loop < elapsed_time
+    return elapsed_time > threshold
 
   if loop != 0:
     tq.poll(
@@ -245,7 +245,7 @@ class MeshTask(RegisteredTask):
 
     if not dust_global:
       segids, pxct = fastremap.unique(data, return_counts=True)
-      dust_segids = [ sid for sid, ct in zip(segids, pxct) if ct < int(dust_threshold) ]
+      dust_segids = segids[ pxct < int(dust_threshold) ]
       return fastremap.mask(data, dust_segids, in_place=True)
     else:
       return self.apply_dust_global_threshold(dust_threshold, data)
@@ -273,13 +273,12 @@ class MeshTask(RegisteredTask):
 
     mb = IntMap(buf)
     uniq = fastremap.unique(all_labels)
+    uniq = uniq[uniq != 0]
 
-    valid_objects = []
-    for label in uniq:
-      if label == 0:
-        continue
-      if mb[label] >= self.dust_threshold:
-        valid_objects.append(label)
+    valid_objects = [
+      label for label in uniq
+      if mb[label] >= self.dust_threshold
+    ]
 
     return fastremap.mask_except(all_labels, valid_objects)
 
@@ -51,8 +51,6 @@ from functools import lru_cache
 import datetime
 import pytz
 
-import networkx as nx
-
 import cc3d
 
 from tqdm import tqdm
@@ -101,20 +99,20 @@ def remap_segmentation(
   for unsafe_root_id in tqdm(unsafe_dict.keys(), desc="Unsafe Relabel", disable=(not progress)):
     bin_seg = seg == unsafe_root_id
 
-    if np.sum(bin_seg) == 0:
+    if not np.any(bin_seg):
         continue
 
-    cc_seg = cc3d.connected_components(bin_seg)
-    for i_cc in range(1, np.max(cc_seg) + 1):
+    cc_seg, n_cc = cc3d.connected_components(bin_seg, return_N=True)
+    for i_cc in range(1, n_cc + 1):
       bin_cc_seg = cc_seg == i_cc
 
       overlaps = []
-      overlaps.extend(np.unique(seg[-2, :, :][bin_cc_seg[-1, :, :]]))
-      overlaps.extend(np.unique(seg[:, -2, :][bin_cc_seg[:, -1, :]]))
-      overlaps.extend(np.unique(seg[:, :, -2][bin_cc_seg[:, :, -1]]))
-      overlaps = np.unique(overlaps)
+      overlaps.extend(fastremap.unique(seg[-2, :, :][bin_cc_seg[-1, :, :]]))
+      overlaps.extend(fastremap.unique(seg[:, -2, :][bin_cc_seg[:, -1, :]]))
+      overlaps.extend(fastremap.unique(seg[:, :, -2][bin_cc_seg[:, :, -1]]))
+      overlaps = fastremap.unique(np.asarray(overlaps, dtype=seg.dtype))
 
-      linked_l2_ids = overlaps[np.in1d(overlaps, unsafe_dict[unsafe_root_id])]
+      linked_l2_ids = overlaps[np.isin(overlaps, unsafe_dict[unsafe_root_id])]
 
       if len(linked_l2_ids) == 0:
         seg[bin_cc_seg] = 0
@@ -259,7 +257,7 @@ def get_lx_overlapping_remappings(
       )
 
       safe_lx_ids = lx_ids[u_idx[c_root_ids == 1]]
-      unsafe_lx_ids = lx_ids[~np.in1d(lx_ids, safe_lx_ids)]
+      unsafe_lx_ids = lx_ids[~np.isin(lx_ids, safe_lx_ids)]
       unsafe_root_ids = np.unique(root_ids[u_idx[c_root_ids != 1]])
 
   lx_root_dict = dict(zip(neigh_lx_ids, neigh_root_ids))
@@ -289,7 +287,7 @@ def get_lx_overlapping_remappings(
 
   unsafe_dict = collections.defaultdict(list)
   for root_id in unsafe_root_ids:
-    if np.sum(~np.in1d(root_lx_dict[root_id], unsafe_lx_ids)) == 0:
+    if np.sum(~np.isin(root_lx_dict[root_id], unsafe_lx_ids)) == 0:
       continue
 
     for neigh_lx_id in root_lx_dict[root_id]:
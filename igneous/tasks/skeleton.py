@@ -1,6 +1,5 @@
 from typing import Optional,Sequence,Dict
 
-from functools import reduce
 import itertools
 import json
 import mmap
@@ -294,13 +293,12 @@ class SkeletonTask(RegisteredTask):
 
     mb = IntMap(buf)
     uniq = fastremap.unique(all_labels)
+    uniq = uniq[uniq != 0]
 
-    valid_objects = []
-    for label in uniq:
-      if label == 0:
-        continue
-      if mb[label] >= self.dust_threshold:
-        valid_objects.append(label)
+    valid_objects = [
+      label for label in uniq
+      if mb[label] >= self.dust_threshold
+    ]
 
     return fastremap.mask_except(all_labels, valid_objects)
 
@@ -411,23 +409,26 @@ class UnshardedSkeletonMergeTask(RegisteredTask):
 
   def get_skeletons_by_segid(self, filenames):
     cf = CloudFiles(self.cloudpath, progress=False)
-    skels = cf.get(filenames)
 
+    # Download in blocks so that only a block's worth of
+    # compressed fragment files is resident at once. The
+    # unpickled skeletons are much smaller than the raw files.
     skeletons = defaultdict(list)
-    for skel in skels:
-      try:
-        segid = filename_to_segid(skel['path'])
-      except ValueError:
-        # Typically this is due to preexisting fully
-        # formed skeletons e.g. skeletons_mip_3/1588494
-        continue
-
-      skeletons[segid].append( 
-        (
-          Bbox.from_filename(skel['path']),
-          pickle.loads(skel['content'])
+    for filenames_block in sip(filenames, 50):
+      for skel in cf.get(filenames_block):
+        try:
+          segid = filename_to_segid(skel['path'])
+        except ValueError:
+          # Typically this is due to preexisting fully
+          # formed skeletons e.g. skeletons_mip_3/1588494
+          continue
+
+        skeletons[segid].append(
+          (
+            Bbox.from_filename(skel['path']),
+            pickle.loads(skel['content'])
+          )
         )
-      )
 
     return skeletons
 
@@ -1,4 +1,5 @@
-from functools import reduce
+from functools import lru_cache, reduce
+import importlib
 import math
 import multiprocessing as mp
 import json
@@ -15,22 +16,63 @@ from cloudvolume.lib import max2
 from cloudfiles import CloudFiles
 import cloudfiles.paths
 import numpy as np
-from taskqueue import TaskQueue, LocalTaskQueue
-from taskqueue.lib import toabs
-from taskqueue.paths import get_protocol
 from tqdm import tqdm
 
-from igneous import task_creation as tc
-from igneous import downsample_scales
 from igneous.secrets import LEASE_SECONDS, SQS_REGION_NAME
 
 from igneous_cli.humanbytes import format_bytes
 
+class LazyModule:
+  """
+  Defer a heavyweight import until first attribute access.
+  task_creation pulls in the entire task library (meshing,
+  skeletonization, etc.) which costs hundreds of milliseconds
+  that informational commands like --help never need to pay.
+  """
+  def __init__(self, module_name):
+    self._module_name = module_name
+    self._module = None
+  def __getattr__(self, attr):
+    if self._module is None:
+      self._module = importlib.import_module(self._module_name)
+    return getattr(self._module, attr)
+
+tc = LazyModule("igneous.task_creation")
+downsample_scales = LazyModule("igneous.downsample_scales")
+
+def cpu_count():
+  """
+  mp.cpu_count() reports the host's core count even inside a
+  container with a cpu quota, which oversubscribes the workers.
+  The scheduler affinity mask reflects what we may actually use.
+  """
+  if hasattr(os, "sched_getaffinity"):
+    return len(os.sched_getaffinity(0))
+  return mp.cpu_count()
+
+@lru_cache(maxsize=32)
 def normalize_path(queuepath):
+  from taskqueue.lib import toabs
+  from taskqueue.paths import get_protocol
   if not get_protocol(queuepath):
     return "fq://" + toabs(queuepath)
   return queuepath
 
+_queues = {}
+
+def get_task_queue(queuepath, region_name=None):
+  """
+  Construct a TaskQueue once per (queue, region) and reuse it.
+  An SQS queue costs a boto3 client (credential chain walk plus
+  TLS handshake) to set up, which adds up when several rounds of
+  tasks flow through the same queue in a single invocation.
+  """
+  from taskqueue import TaskQueue
+  key = (normalize_path(queuepath), region_name)
+  if key not in _queues:
+    _queues[key] = TaskQueue(key[0], region_name=region_name)
+  return _queues[key]
+
 def intify(x):
   return None if x is None else int(x)
 
@@ -48,17 +90,49 @@ def normalize_encoding(encoding):
 
 ENCODING_HELP = "Which image encoding to use. Options: [all] raw, png; [images] jpeg; [segmentations] compressed_segmentation (cseg), compresso (cpso), crackle (ckl); [floats] fpzip, kempressed, zfpc"
 
-def enqueue_tasks(ctx, queue, tasks):
+FACTOR_2D = (2,2,1)
+FACTOR_3D = (2,2,2)
+
+def enqueue_tasks(ctx, queue, tasks, insert_concurrency=0):
   parallel = int(ctx.obj.get("parallel", 1))
 
   if queue is None:
+    from taskqueue import LocalTaskQueue
     tq = LocalTaskQueue(parallel=parallel)
     tq.insert_all(tasks)
-  else:
-    tq = TaskQueue(normalize_path(queue))
+    return tq
+
+  # Uploading task descriptions is network bound, so it can pay
+  # to use more inserter processes than local cores.
+  if insert_concurrency > 0:
+    parallel = int(insert_concurrency)
+
+  # A comma separated list of queues shards the tasks across
+  # them, scaling insert and lease throughput past the ceiling
+  # of a single queue. Pass the same list to "igneous execute".
+  queues = queue.split(",")
+  if len(queues) == 1:
+    tq = get_task_queue(queue)
     tq.insert(tasks, parallel=parallel)
+    return tq
+
+  for qpath, shard in zip(queues, shard_tasks(tasks, len(queues))):
+    tq = get_task_queue(qpath)
+    tq.insert(shard, parallel=parallel)
   return tq
 
+def shard_tasks(tasks, num_shards):
+  """Split a task iterator into num_shards roughly equal pieces."""
+  try:
+    N = len(tasks)
+    tasks[0:0]
+  except TypeError:
+    tasks = list(tasks)
+    N = len(tasks)
+
+  for i in range(num_shards):
+    yield tasks[(N * i) // num_shards:(N * (i+1)) // num_shards]
+
 class TupleN(click.ParamType):
   """A command line option type consisting of 3 comma-separated integers."""
   name = 'tupleN'
@@ -168,9 +242,9 @@ def main(ctx, parallel):
   """
   parallel = int(parallel)
   if parallel == 0:
-    parallel = mp.cpu_count()
+    parallel = cpu_count()
   ctx.ensure_object(dict)
-  ctx.obj["parallel"] = max(min(parallel, mp.cpu_count()), 1)
+  ctx.obj["parallel"] = max(min(parallel, cpu_count()), 1)
 
 @main.command()
 def license():
@@ -211,13 +285,15 @@ def imagegroup():
 @click.option('--xrange', type=Tuple2(), default=None, help="If specified, set x-bounds for downsampling in terms of selected mip. By default the whole dataset is selected. The bounds must be chunk aligned to the task size (maybe mysterious... use igneous design to investigate). e.g. 0,1024.", show_default=True)
 @click.option('--yrange', type=Tuple2(), default=None, help="If specified, set y-bounds for downsampling in terms of selected mip. By default the whole dataset is selected. The bounds must be chunk aligned to the task size (maybe mysterious... use igneous design to investigate). e.g. 0,1024", show_default=True)
 @click.option('--zrange', type=Tuple2(), default=None, help="If specified, set z-bounds for downsampling in terms of selected mip. By default the whole dataset is selected. The bounds must be chunk aligned to the task size (maybe mysterious... use igneous design to investigate). e.g. 0,1", show_default=True)
+@click.option('--insert-concurrency', default=0, type=int, help="Insert tasks into the queue with this many processes. 0 means use the -p value.", show_default=True)
 @click.pass_context
 def downsample(
-  ctx, path, queue, mip, fill_missing, 
-  num_mips, encoding, encoding_level, sparse, 
+  ctx, path, queue, mip, fill_missing,
+  num_mips, encoding, encoding_level, sparse,
   chunk_size, compress, volumetric,
   delete_bg, bg_color, sharded, memory,
-  xrange, yrange, zrange, 
+  xrange, yrange, zrange,
+  insert_concurrency,
 ):
   """
   Create an image pyramid for grayscale or labeled images.
@@ -238,9 +314,7 @@ def downsample(
       print("igneous: sharded downsamples only support producing one mip at a time. num_mips set to 1")
     num_mips = 1
 
-  factor = (2,2,1)
-  if volumetric:
-  	factor = (2,2,2)
+  factor = FACTOR_3D if volumetric else FACTOR_2D
 
   bounds = compute_bounds(path, mip, xrange, yrange, zrange)
 
@@ -266,7 +340,7 @@ def downsample(
       encoding_level=encoding_level,
     )
 
-  enqueue_tasks(ctx, queue, tasks)
+  enqueue_tasks(ctx, queue, tasks, insert_concurrency)
 
 @imagegroup.command()
 @click.argument("src", type=CloudPath())
@@ -297,16 +371,18 @@ def downsample(
 @click.option('--zrange', type=Tuple2(), default=None, help="If specified, set z-bounds for sampling in terms of selected bounds mip. By default the whole dataset is selected. The bounds must be chunk aligned to the task size e.g. 0,1", show_default=True)
 @click.option('--bounds-mip', default=None, type=int, help="Which mip level are xrange, yrange, and zrange specified in?", show_default=True)
 @click.option('--cutout', is_flag=True, default=False, help="If bounds are specified and creating a new volume, restrict the new volume to the specified bounds.", show_default=True)
+@click.option('--insert-concurrency', default=0, type=int, help="Insert tasks into the queue with this many processes. 0 means use the -p value.", show_default=True)
 @click.pass_context
 def xfer(
-	ctx, src, dest, queue, translate, 
-  downsample, mip, fill_missing, 
-  memory, max_mips, shape, sparse, 
+	ctx, src, dest, queue, translate,
+  downsample, mip, fill_missing,
+  memory, max_mips, shape, sparse,
   encoding, encoding_level, chunk_size, compress,
   volumetric, delete_bg, bg_color, sharded,
   dest_voxel_offset, clean_info, no_src_update,
-  truncate_scales, 
-  xrange, yrange, zrange, bounds_mip, cutout
+  truncate_scales,
+  xrange, yrange, zrange, bounds_mip, cutout,
+  insert_concurrency,
 ):
   """
   Copy, re-encode, or shard an image layer.
@@ -326,9 +402,7 @@ def xfer(
   Use the --memory flag to automatically compute the
   a reasonable task shape based on your memory limits.
   """
-  factor = (2,2,1)
-  if volumetric:
-  	factor = (2,2,2)
+  factor = FACTOR_3D if volumetric else FACTOR_2D
 
   if compress and compress.lower() in ("none", "false"):
     compress = False
@@ -364,7 +438,7 @@ def xfer(
       bounds=bounds, bounds_mip=bounds_mip, cutout=cutout,
     )
 
-  enqueue_tasks(ctx, queue, tasks)
+  enqueue_tasks(ctx, queue, tasks, insert_concurrency)
 
 @imagegroup.command("roi")
 @click.argument("src", type=CloudPath())
@@ -708,7 +782,7 @@ def ccl_auto(
   For local volumes, execute all steps automatically.
   """
   parallel = int(ctx.obj.get("parallel", 1))
-  args = (queue, None, LEASE_SECONDS, True, -1, True, False)
+  args = (queue, None, LEASE_SECONDS, True, -1, True, False, -1)
 
   tasks = tc.create_ccl_face_tasks(
     src, mip, shape,
@@ -760,46 +834,156 @@ def ccl_auto(
 @click.option('-q', '--quiet', is_flag=True, default=False, help='Suppress task status messages.', show_default=True)
 @click.option('-x', '--exit-on-empty', is_flag=True, default=False, help="Exit immediately when the queue is empty. Not reliable for SQS as measurements are approximate.", show_default=True)
 @click.option('-n', '--num-tasks', type=int, default=-1, help="Process this many tasks. Use -1 to indicate no limit.", show_default=True)
+@click.option('--no-affinity', is_flag=True, default=False, help="Don't pin worker processes to disjoint cpu cores.", show_default=True)
+@click.option('--max-tasks-per-child', default=0, type=int, help="Retire each worker process after this many tasks and start a fresh one, bounding memory growth on long runs. Only recycles while looping forever. 0 disables.", show_default=True)
 @click.pass_context
 def execute(
   ctx, queue, aws_region,
   lease_sec, tally, min_sec,
   exit_on_empty, quiet, num_tasks,
+  no_affinity, max_tasks_per_child,
 ):
   """Execute igneous tasks from a queue.
 
-  The queue must be an AWS SQS queue or a FileQueue directory. 
+  The queue must be an AWS SQS queue or a FileQueue directory.
   Examples: (SQS) sqs://my-queue (FileQueue) fq://./my-queue
   (the fq:// is optional).
 
+  A comma separated list of queues assigns workers round-robin
+  across them, matching the sharded insert produced by passing
+  the same list to a task creation command.
+
   See https://github.com/seung-lab/python-task-queue
   """
   parallel = int(ctx.obj.get("parallel", 1))
   args = (queue, aws_region, lease_sec, tally, min_sec, exit_on_empty, quiet, num_tasks)
-  parallel_execute_helper(parallel, args)
+  parallel_execute_helper(
+    parallel, args,
+    affinity=(not no_affinity),
+    max_tasks_per_child=max_tasks_per_child,
+  )
+
+def set_worker_affinity(worker_id, parallel):
+  """
+  Pin this worker to a disjoint subset of the available
+  cores. Prevents the scheduler from migrating pollers
+  between cores, which measurably degrades throughput on
+  high core count machines.
+  """
+  if not hasattr(os, "sched_setaffinity"):
+    return
+
+  cores = sorted(os.sched_getaffinity(0))
+  if parallel >= len(cores):
+    cores = [ cores[worker_id % len(cores)] ]
+  else:
+    cores_per_worker = len(cores) // parallel
+    offset = worker_id * cores_per_worker
+    cores = cores[offset:offset + cores_per_worker]
+
+  if cores:
+    os.sched_setaffinity(0, cores)
+
+def execute_worker(worker_id, parallel, affinity, args):
+  # queue connections inherited from the parent can't be
+  # shared across a fork
+  _queues.clear()
+  if affinity:
+    set_worker_affinity(worker_id, parallel)
+  execute_helper(*args)
+
+def parallel_execute_helper(parallel, args, affinity=True, max_tasks_per_child=0):
+  # Workers are assigned round-robin to the (possibly several)
+  # queues so a sharded insert can be drained with one command.
+  queues = args[0].split(",")
+  (_, _, _, _, min_sec, exit_on_empty, _, num_tasks) = args
+
+  # Workers map to queues round-robin, so fewer workers than
+  # queues leaves the tail of the list unpolled.
+  if parallel < len(queues):
+    unpolled = ", ".join(queues[parallel:])
+    print(f"Warning: {len(queues)} queues but only {parallel} worker(s). Not polled: {unpolled}")
+
+  # Workers can only be recycled when the job is unbounded.
+  # With a global task or time budget, accounting for it
+  # across child generations isn't possible from the parent.
+  recycle = False
+  if max_tasks_per_child > 0:
+    recycle = (min_sec < 0 and num_tasks < 0 and not exit_on_empty)
+    if recycle:
+      args = args[:7] + (max_tasks_per_child,)
+    else:
+      print("--max-tasks-per-child ignored: recycling requires looping forever (--min-sec -1, -n -1, and no -x).")
 
-def parallel_execute_helper(parallel, args):
-  if parallel == 1:
-    execute_helper(*args)
+  if parallel == 1 and not recycle:
+    execute_helper(queues[0], *args[1:])
     return
 
-  pool = mp.Pool(processes=parallel)
+  # Warm the lazily imported modules in the parent so forked
+  # workers inherit them instead of importing once per process.
+  import taskqueue
+
+  # Fork (rather than spawn or forkserver) so every worker
+  # shares the parent's already imported module tree via
+  # copy-on-write. The CLI imports the heavyweight stack at
+  # module scope, so those pages are warm before the first
+  # fork and N workers don't pay N redundant import costs.
+  if "fork" in mp.get_all_start_methods():
+    mp_ctx = mp.get_context("fork")
+  else:
+    mp_ctx = mp.get_context()
+
+  # Each worker is an identical infinite poller, so a bare
+  # process per worker suffices. mp.Pool adds result handler
+  # and worker management threads that burn CPU needlessly
+  # on high core count machines.
+  def spawn(worker_id):
+    worker_args = (queues[worker_id % len(queues)],) + tuple(args[1:])
+    proc = mp_ctx.Process(
+      target=execute_worker,
+      args=(worker_id, parallel, affinity, worker_args),
+    )
+    proc.start()
+    return proc
+
+  processes = [ spawn(i) for i in range(parallel) ]
+
   try:
-    for _ in range(parallel):
-      pool.apply_async(execute_helper, args)
-    pool.close()
-    pool.join()
+    if recycle:
+      # Replace each worker with a fresh process after it
+      # finishes its allotment, capping heap growth and
+      # allocator fragmentation over long runs. A clean exit
+      # means the allotment finished; a nonzero exit means a
+      # crash and respawning would just fork/crash forever.
+      while any(processes):
+        time.sleep(1)
+        for i, proc in enumerate(processes):
+          if proc is None or proc.is_alive():
+            continue
+          proc.join()
+          if proc.exitcode == 0:
+            processes[i] = spawn(i)
+          else:
+            print(f"Worker {i} exited with code {proc.exitcode}. Not restarting.")
+            processes[i] = None
+    else:
+      for proc in processes:
+        proc.join()
   except KeyboardInterrupt:
     print("Interrupted. Exiting.")
-    pool.terminate()
-    pool.join()
+    for proc in processes:
+      if proc is not None:
+        proc.terminate()
+    for proc in processes:
+      if proc is not None:
+        proc.join()
 
 def execute_helper(
   queue, aws_region, lease_sec, 
   tally, min_sec, exit_on_empty,
   quiet, num_tasks,
 ):
-  tq = TaskQueue(normalize_path(queue), region_name=aws_region)
+  tq = get_task_queue(queue, region_name=aws_region)
 
   sqs_sec_to_wait = 120
   start_time = time.time()
@@ -833,6 +1017,11 @@ def execute_helper(
     else:
       return tq.is_empty()
 
+  # inf sentinel makes "run forever" fall through the same
+  # comparison as a real deadline, which is evaluated on every
+  # task completion.
+  min_sec_threshold = min_sec if min_sec >= 0 else float('inf')
+
   def stop_after_elapsed_time(tries, executed, elapsed_time):
     if exit_on_empty and is_empty():
       return True
@@ -840,9 +1029,7 @@ def execute_helper(
     if num_tasks >= 0 and executed >= num_tasks:
       return True
 
-    if min_sec < 0:
-      return False
-    return min_sec < elapsed_time
+    return elapsed_time > min_sec_threshold
 
   if min_sec != 0:
     tq.poll(
@@ -851,9 +1038,33 @@ def execute_helper(
       tally=tally,
       stop_fn=stop_after_elapsed_time,
     )
+  elif num_tasks > 1:
+    from taskqueue import QueueEmptyError
+
+    # Lease in batches rather than one round trip per task. SQS
+    # caps ReceiveMessage at 10 messages and may return fewer
+    # than requested, so keep leasing until the budget is spent
+    # or the queue is empty.
+    executed = 0
+    try:
+      while executed < num_tasks:
+        batch = min(num_tasks - executed, 10)
+        if batch == 1:
+          tasks = [ tq.lease(seconds=lease_sec) ]
+        else:
+          tasks = tq.lease(seconds=lease_sec, num_tasks=batch)
+        for task in tasks:
+          task.execute()
+          executed += 1
+        # ack the whole batch in one request
+        # (DeleteMessageBatch on SQS)
+        tq.delete(tasks)
+    except QueueEmptyError:
+      pass
   else:
     task = tq.lease(seconds=lease_sec)
     task.execute()
+    tq.delete(task)
 
 @main.group("mesh")
 def meshgroup():
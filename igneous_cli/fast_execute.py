@@ -0,0 +1,58 @@
+"""
+Minimal frontend for "igneous execute" with a fast cold start.
+
+When igneous workers are launched once per pod or once per file by an
+orchestration system, the cost of importing click and the full
+dependency stack just to parse a handful of options adds up. This
+entry point parses with argparse from the standard library and only
+imports the heavyweight machinery after parsing succeeds.
+
+Registered as the "igneous-execute" console script. Options mirror
+"igneous execute".
+"""
+import argparse
+import os
+
+SQS_REGION_NAME = os.environ.get('SQS_REGION_NAME', 'us-east-1')
+LEASE_SECONDS = int(os.environ.get('LEASE_SECONDS', 600))
+
+def main():
+  parser = argparse.ArgumentParser(
+    description="Execute igneous tasks from a queue. Low overhead equivalent of \"igneous execute\"."
+  )
+  parser.add_argument("queue", help="AWS SQS queue or FileQueue directory. e.g. sqs://my-queue or fq://./my-queue")
+  parser.add_argument("-p", "--parallel", default=1, type=int, help="Run with this number of parallel processes. If 0, use number of cores.")
+  parser.add_argument("--aws-region", default=SQS_REGION_NAME, help="AWS region in which the SQS queue resides.")
+  parser.add_argument("--lease-sec", default=LEASE_SECONDS, type=int, help="Seconds to lease a task for.")
+  parser.add_argument("--no-tally", action="store_true", help="Don't tally completed fq tasks.")
+  parser.add_argument("--min-sec", default=-1, type=float, help="Execute for at least this many seconds and quit after the last task finishes. Special values: (0) Run at most a single task. (-1) Loop forever (default).")
+  parser.add_argument("-q", "--quiet", action="store_true", help="Suppress task status messages.")
+  parser.add_argument("-x", "--exit-on-empty", action="store_true", help="Exit immediately when the queue is empty.")
+  parser.add_argument("-n", "--num-tasks", default=-1, type=int, help="Process this many tasks. Use -1 to indicate no limit.")
+  parser.add_argument("--no-affinity", action="store_true", help="Don't pin worker processes to disjoint cpu cores.")
+  parser.add_argument("--max-tasks-per-child", default=0, type=int, help="Retire each worker process after this many tasks and start a fresh one, bounding memory growth on long runs. Only recycles while looping forever. 0 disables.")
+  args = parser.parse_args()
+
+  # deferred so --help and argument errors never pay for it
+  from igneous_cli.cli import parallel_execute_helper
+
+  parallel = args.parallel
+  if parallel == 0:
+    if hasattr(os, "sched_getaffinity"):
+      parallel = len(os.sched_getaffinity(0))
+    else:
+      parallel = os.cpu_count()
+
+  helper_args = (
+    args.queue, args.aws_region, args.lease_sec,
+    (not args.no_tally), args.min_sec, args.exit_on_empty,
+    args.quiet, args.num_tasks,
+  )
+  parallel_execute_helper(
+    max(parallel, 1), helper_args,
+    affinity=(not args.no_affinity),
+    max_tasks_per_child=args.max_tasks_per_child,
+  )
+
+if __name__ == "__main__":
+  main()
@@ -5,7 +5,8 @@ setuptools.setup(
   setup_requires=['pbr', 'numpy'],
   entry_points={
     "console_scripts": [
-      "igneous=igneous_cli:main"
+      "igneous=igneous_cli:main",
+      "igneous-execute=igneous_cli.fast_execute:main",
     ],
   },
   extras_require={